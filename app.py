@@ -1,31 +1,45 @@
 import os
 import io
+import re
+import hashlib
+import threading
 import logging
 from datetime import datetime
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session
 from flask_login import LoginManager, login_user, login_required, logout_user, current_user
 from werkzeug.utils import secure_filename
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
 from models import db, User, Photo, Like, Comment, Save
-from textblob import TextBlob
-from PIL import Image, ImageStat
+from PIL import Image, features
 from dotenv import load_dotenv
 import urllib.parse
 import io
 import logging
 from datetime import datetime
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session
 from flask_login import LoginManager, login_user, login_required, logout_user, current_user
 from werkzeug.utils import secure_filename
-from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.security import check_password_hash
 from models import db, User, Photo, Like, Comment, Save
-from textblob import TextBlob
-from PIL import Image, ImageStat
+from imaging import process_upload
+from PIL import Image, features
 from dotenv import load_dotenv
 import urllib.parse
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import defaultdict, OrderedDict
+from functools import lru_cache
+from flask_caching import Cache
+from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+from argon2 import PasswordHasher
+from argon2.exceptions import VerifyMismatchError, InvalidHashError
+from sqlalchemy import func, select, union
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.orm import joinedload, selectinload, raiseload
 
 # --- AZURE STORAGE LIBRARY ---
-from azure.storage.blob import BlobServiceClient
+from azure.storage.blob import BlobServiceClient, ContentSettings
 
 # .env file se variables load karein
 load_dotenv()
@@ -63,7 +77,7 @@ if raw_conn:
     else:
         try:
             # Azure-style Key-Value parsing logic taake SQLalchemy connect ho sakay
-            conn_params = dict(pair.split('=', 1) for pair in raw_conn.split())
+            conn_params = {k: v for k, _, v in (pair.partition('=') for pair in raw_conn.split()) if k and v}
             user = conn_params.get('user') or conn_params.get('username')
             password = urllib.parse.quote_plus(conn_params.get('password', ''))
             host = conn_params.get('host', 'localhost')
@@ -82,6 +96,19 @@ else:
 
 app.config['SQLALCHEMY_DATABASE_URI'] = SQLALCHEMY_DATABASE_URI
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Drop dead connections before use (Azure idles them out); sized pool for the server DB
+engine_options = {'pool_pre_ping': True}
+if not SQLALCHEMY_DATABASE_URI.startswith('sqlite'):
+    engine_options.update(pool_size=10, max_overflow=20)
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
+# Debug/CI: unloaded relationships raise instead of silently lazy-loading (catches N+1 regressions)
+app.config['RAISE_ON_LAZY_LOAD'] = app.debug or os.getenv('RAISE_ON_LAZY_LOAD', '').lower() in ('1', 'true')
+
+# --- CACHE CONFIGURATION ---
+# Redis only: invalidation must reach every Gunicorn worker, so without a shared backend caching is off
+REDIS_URL = os.getenv('REDIS_URL')
+cache = Cache(app, config={'CACHE_TYPE': 'RedisCache', 'CACHE_REDIS_URL': REDIS_URL} if REDIS_URL
+              else {'CACHE_TYPE': 'NullCache', 'CACHE_NO_NULL_WARNING': True})
 
 # --- AZURE BLOB STORAGE CONFIGURATION ---
 AZURE_CONNECTION_STRING = os.getenv('AZURE_STORAGE_CONNECTION_STRING')
@@ -99,9 +126,133 @@ if AZURE_CONNECTION_STRING:
     except Exception as e:
         logger.error('Azure Storage Error: %s', e)
 
+# Image decode/encode runs in a small side pool. Sync Gunicorn workers take one request at a time, so
+# this isolates the worker from decoder crashes and memory spikes rather than adding parallelism.
+# forkserver children start from a clean server process instead of forking this threaded one.
+IMAGE_POOL_WORKERS = 2
+_image_mp_context = multiprocessing.get_context('forkserver')
+_image_mp_context.set_forkserver_preload(['__main__', 'imaging'])
+_image_pool = None
+_image_pool_lock = threading.Lock()
+
+def _image_pool_submit(raw_bytes):
+    global _image_pool
+    with _image_pool_lock:
+        if _image_pool is None:
+            _image_pool = ProcessPoolExecutor(max_workers=IMAGE_POOL_WORKERS, mp_context=_image_mp_context)
+        pool = _image_pool
+    try:
+        return pool.submit(process_upload, raw_bytes).result()
+    except BrokenProcessPool:
+        # A dead child breaks the executor for good; drop it so the next call builds a fresh one
+        with _image_pool_lock:
+            if _image_pool is pool:
+                _image_pool = None
+        pool.shutdown(wait=False)
+        raise
+
+def _process_upload(raw_bytes):
+    try:
+        return _image_pool_submit(raw_bytes)
+    except BrokenProcessPool:
+        logger.warning('Image worker process died; retrying once on a fresh pool')
+        return _image_pool_submit(raw_bytes)
+
+# Retried uploads of the same file reuse the previous (webp_bytes, auto_tags); entries are
+# thumbnail-sized, so a small LRU keyed by content hash is enough
+UPLOAD_CACHE_SIZE = 64
+_processed_uploads = OrderedDict()
+_processed_uploads_lock = threading.Lock()
+
+def _process_upload_cached(raw_bytes):
+    key = hashlib.blake2b(raw_bytes, digest_size=16).digest()
+    with _processed_uploads_lock:
+        if key in _processed_uploads:
+            _processed_uploads.move_to_end(key)
+            return _processed_uploads[key]
+    result = _process_upload(raw_bytes)
+    with _processed_uploads_lock:
+        _processed_uploads[key] = result
+        if len(_processed_uploads) > UPLOAD_CACHE_SIZE:
+            _processed_uploads.popitem(last=False)
+    return result
+
+# Background pool for blob uploads so the request thread doesn't wait on Azure
+upload_executor = ThreadPoolExecutor(max_workers=8)
+
+def _photo_fields_error(photo_fields):
+    """Message for the first form value the photo table would reject, else None."""
+    if not photo_fields.get('title'):
+        return 'A title is required.'
+    for name, value in photo_fields.items():
+        limit = getattr(Photo.__table__.c[name].type, 'length', None)
+        if limit and value and len(value) > limit:
+            return f"{name.replace('_', ' ').title()} must be at most {limit} characters."
+    return None
+
+# The user has already been redirected when this runs, so failures only reach the server
+# log ('Background upload failed ...'); a blob whose row can't be committed is deleted.
+def _upload_and_commit(buf, blob_name, photo_fields):
+    bc = blob_service_client.get_blob_client(container=AZURE_CONTAINER_NAME, blob=blob_name)
+    try:
+        # Known length lets the SDK split the stream into parallel block uploads
+        bc.upload_blob(buf, length=buf.getbuffer().nbytes, overwrite=True, max_concurrency=4,
+                       content_settings=ContentSettings(content_type='image/webp'))
+        logger.info('Uploaded to Azure: %s', bc.url)
+    except Exception:
+        logger.exception('Background upload failed for blob %s', blob_name)
+        return
+    try:
+        with app.app_context():
+            db.session.add(Photo(filename=bc.url, **photo_fields))
+            db.session.commit()
+    except Exception:
+        logger.exception('Background upload failed: Photo insert for blob %s; deleting the blob', blob_name)
+        try:
+            bc.delete_blob()
+        except Exception:
+            logger.exception('Failed deleting orphaned Azure blob %s', blob_name)
+
+# Most uploads are JPEG, so decoding them is a large share of upload time (they're re-encoded as WebP).
+# PyPI Pillow wheels ship libjpeg-turbo; a source build against plain libjpeg decodes roughly 2x slower
+if features.check_feature('libjpeg_turbo'):
+    logger.info('Pillow %s using libjpeg-turbo %s', Image.__version__, features.version_feature('libjpeg_turbo'))
+else:
+    logger.warning('Pillow %s built without libjpeg-turbo; decoding JPEG uploads will be slower', Image.__version__)
+
 # Database Initialize
 db.init_app(app)
 
+# Feed search uses leading-wildcard ILIKE, which a btree can't serve; pg_trgm GIN indexes can
+TRIGRAM_INDEXES = {
+    'ix_photo_title_trgm': ('photo', 'title'),
+    'ix_photo_caption_trgm': ('photo', 'caption'),
+    'ix_photo_location_trgm': ('photo', 'location'),
+    'ix_user_username_trgm': ('"user"', 'username'),
+}
+
+def _create_trigram_indexes():
+    try:
+        with db.engine.begin() as conn:
+            conn.execute(db.text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+            for name, (table, column) in TRIGRAM_INDEXES.items():
+                conn.execute(db.text(f'CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops)'))
+        logger.info('Trigram search indexes checked/created.')
+    except Exception:
+        # Azure Flexible Server needs pg_trgm allow-listed in azure.extensions; search still works unindexed
+        logger.warning('Could not create pg_trgm search indexes', exc_info=True)
+
+def _create_photo_indexes():
+    # create_all() skips existing tables, so indexes added later must be created explicitly;
+    # IF NOT EXISTS because every Gunicorn worker runs this at import
+    try:
+        with db.engine.begin() as conn:
+            for index in Photo.__table__.indexes:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+    except Exception:
+        # Workers can still race inside CREATE INDEX on PostgreSQL; the winner has created it
+        logger.warning('Could not create photo indexes', exc_info=True)
+
 # Auto-create tables on startup
 with app.app_context():
     try:
@@ -109,6 +260,10 @@ with app.app_context():
         logger.info('Database tables checked/created.')
     except Exception as e:
         logger.exception('Critical: DB Connection Failed. Check Firewall!')
+    else:
+        _create_photo_indexes()
+        if db.engine.dialect.name == 'postgresql':
+            _create_trigram_indexes()
 
 login_manager = LoginManager()
 login_manager.init_app(app)
@@ -118,6 +273,25 @@ login_manager.login_view = 'login'
 def load_user(user_id):
     return User.query.get(int(user_id))
 
+# --- PASSWORD HASHING ---
+# argon2id via libargon2; cost tuned so a login verify stays in the tens of ms
+password_hasher = PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=1)
+
+def verify_password(user, password):
+    """Check a login password; legacy Werkzeug hashes are upgraded to argon2 on success."""
+    if user.password.startswith('$argon2'):
+        try:
+            password_hasher.verify(user.password, password)
+        except (VerifyMismatchError, InvalidHashError):
+            return False
+        if not password_hasher.check_needs_rehash(user.password):
+            return True
+    elif not check_password_hash(user.password, password):
+        return False
+    user.password = password_hasher.hash(password)
+    db.session.commit()
+    return True
+
 # --- TEMPLATE FILTERS ---
 @app.template_filter('timeago')
 def timeago(date):
@@ -128,36 +302,56 @@ def timeago(date):
     if s < 86400: return f"{int(s//3600)}h ago"
     return f"{int(s//86400)}d ago"
 
-# --- DETAILED AI IMAGE ANALYSIS ---
-def analyze_image(img_obj):
-    tags = []
-    try:
-        if img_obj.mode != 'RGB': img_obj = img_obj.convert('RGB')
-        
-        # 1. Quality Analysis
-        width, height = img_obj.size
-        tags.append("HD ᴴᴰ" if width * height > 1000000 else "SD")
-
-        # 2. Brightness Analysis
-        stat = ImageStat.Stat(img_obj.convert('L'))
-        brightness = stat.mean[0]
-        if brightness > 150: tags.append("Bright ☀️")
-        elif brightness < 80: tags.append("Dark 🌙")
-        else: tags.append("Neutral Lighting ☁️")
-
-        # 3. Color Analysis (Advanced Tone Detection)
-        img_small = img_obj.resize((1, 1))
-        r, g, b = img_small.getpixel((0, 0))
-        if r > g and r > b: tags.append("Warm Tone 🔴")
-        elif b > r and b > g: tags.append("Cool Tone 🔵")
-        else: tags.append("Balanced Color 🎨")
+# --- COMMENT SENTIMENT ---
+# VADER: rule/lexicon-based (~7,500 scored terms, handles negation and intensifiers);
+# compound score in [-1, 1]. Built once, since loading the lexicon is the costly part.
+sentiment_analyzer = SentimentIntensityAnalyzer()
 
-    except Exception as e:
-        logger.error(f"AI Analysis Error: {e}")
-        return "Standard Photo"
-    return " | ".join(tags)
+COMMENT_MAX_LENGTH = Comment.__table__.c.text.type.length
+_WORD_RE = re.compile(r"[a-z']+")
+# Rejected outright regardless of sentiment; membership test is O(1) however long the list grows
+BANNED_WORDS = frozenset({
+    'asshole', 'bastard', 'bitch', 'cunt', 'dick', 'fuck', 'fucking', 'kill', 'kys',
+    'retard', 'shit', 'slut', 'whore',
+})
+
+@lru_cache(maxsize=4096)
+def _comment_tokens(text):
+    return tuple(_WORD_RE.findall(text.lower()))
+
+def _has_banned_word(text):
+    return not BANNED_WORDS.isdisjoint(_comment_tokens(text))
+
+@lru_cache(maxsize=4096)
+def _polarity(text):
+    return sentiment_analyzer.polarity_scores(text)['compound']
 
 # --- ROUTES ---
+FEED_PAGE_SIZE = 50
+FEED_CACHE_TIMEOUT = 30
+
+def _feed_cache_key():
+    # A new photo bumps max(id); the user's own likes/saves/comments/deletes bump their version
+    latest = db.session.query(func.max(Photo.id)).scalar()
+    version = cache.get(f'feed-ver:{current_user.id}') or 0
+    return f'feed:{current_user.id}:{version}:{latest}:{request.full_path}'
+
+def _invalidate_feed_cache(user_id):
+    # Runs after the write has committed, so a cache outage must not turn it into a 500
+    try:
+        cache.cache.inc(f'feed-ver:{user_id}')  # INCR on Redis: atomic, no get-then-set race
+    except Exception:
+        logger.warning('Failed to invalidate feed cache for user %s', user_id, exc_info=True)
+
+def _loader_options(*options):
+    if app.config['RAISE_ON_LAZY_LOAD']:
+        options += (raiseload('*'),)
+    return options
+
+def _count_by_photo(model, photo_ids):
+    """{photo_id: row count} for Like/Comment/Save rows, in a single GROUP BY query."""
+    return dict(db.session.query(model.photo_id, func.count())
+                .filter(model.photo_id.in_(photo_ids)).group_by(model.photo_id).all())
 
 @app.route('/')
 def home():
@@ -165,26 +359,61 @@ def home():
 
 @app.route('/feed')
 @login_required
+# Bypassed without Redis (NullCache) so the key's max(id) query isn't paid for nothing; and pending
+# flash messages are rendered into the page, so never serve or store a cached copy then
+@cache.cached(timeout=FEED_CACHE_TIMEOUT, key_prefix=_feed_cache_key,
+              unless=lambda: not REDIS_URL or '_flashes' in session)
 def feed():
     query = request.args.get('q')
+    page = max(request.args.get('page', 1, type=int), 1)
     if query:
         search_term = f"%{query}%"
-        photos = Photo.query.join(User).filter(
-            (Photo.title.ilike(search_term)) | (Photo.caption.ilike(search_term)) | 
-            (Photo.location.ilike(search_term)) | (User.username.ilike(search_term))
-        ).order_by(Photo.uploaded_at.desc()).all()
+        # An OR spanning photo and "user" can't be pushed into either table's scan, so match
+        # each table on its own (each side can use its pg_trgm GIN indexes) and union the ids
+        matching_ids = union(
+            select(Photo.id).where(Photo.title.ilike(search_term) | Photo.caption.ilike(search_term) |
+                                   Photo.location.ilike(search_term)),
+            select(Photo.id).join(User).where(User.username.ilike(search_term)),
+        )
+        photos_q = Photo.query.filter(Photo.id.in_(matching_ids))
     else:
-        photos = Photo.query.order_by(Photo.uploaded_at.desc()).all()
-    return render_template('feed.html', photos=photos)
+        photos_q = Photo.query
+    photos_q = photos_q.options(*_loader_options(joinedload(Photo.creator)))
+    # Fetch one extra row to know whether an older page exists
+    photos = photos_q.order_by(Photo.uploaded_at.desc()).offset((page - 1) * FEED_PAGE_SIZE).limit(FEED_PAGE_SIZE + 1).all()
+    has_next = len(photos) > FEED_PAGE_SIZE
+    photos = photos[:FEED_PAGE_SIZE]
+
+    # likes/comments are lazy='dynamic' (not eager-loadable), so batch them for the whole page
+    photo_ids = [p.id for p in photos]
+    like_counts = _count_by_photo(Like, photo_ids)
+    comments_by_photo = defaultdict(list)
+    for c in Comment.query.options(*_loader_options(joinedload(Comment.user))).filter(Comment.photo_id.in_(photo_ids)).order_by(Comment.id):
+        comments_by_photo[c.photo_id].append(c)
+    # Current user's like/save state for the whole page (only consumers get the buttons)
+    liked_ids, saved_ids = set(), set()
+    if current_user.role == 'consumer':
+        liked_ids = {pid for (pid,) in db.session.query(Like.photo_id)
+                     .filter(Like.user_id == current_user.id, Like.photo_id.in_(photo_ids))}
+        saved_ids = {pid for (pid,) in db.session.query(Save.photo_id)
+                     .filter(Save.user_id == current_user.id, Save.photo_id.in_(photo_ids))}
+    return render_template('feed.html', photos=photos, like_counts=like_counts, comments_by_photo=comments_by_photo,
+                           liked_ids=liked_ids, saved_ids=saved_ids, query=query, page=page, has_next=has_next)
 
 @app.route('/u/<username>')
 @login_required
 def profile(username):
-    user = User.query.filter_by(username=username).first_or_404()
-    photos = Photo.query.filter_by(user_id=user.id).order_by(Photo.uploaded_at.desc()).all()
-    saved = Photo.query.join(Save).filter(Save.user_id == user.id).all()
-    liked = Photo.query.join(Like).filter(Like.user_id == user.id).all()
-    return render_template('profile.html', user=user, photos=photos, saved_photos=saved, liked_photos=liked)
+    # User and their photos (ordered newest first by the backref) in one round-trip + one selectin
+    user = User.query.options(*_loader_options(selectinload(User.photos))).filter_by(username=username).first_or_404()
+    photos = user.photos
+    saved, liked = [], []
+    # Saved/liked tabs are only rendered on a consumer's own profile
+    if current_user.id == user.id and current_user.role == 'consumer':
+        saved = Photo.query.options(*_loader_options()).join(Save).filter(Save.user_id == user.id).all()
+        liked = Photo.query.options(*_loader_options()).join(Like).filter(Like.user_id == user.id).all()
+    photo_ids = {p.id for p in photos + saved + liked}
+    return render_template('profile.html', user=user, photos=photos, saved_photos=saved, liked_photos=liked,
+                           like_counts=_count_by_photo(Like, photo_ids), comment_counts=_count_by_photo(Comment, photo_ids))
 
 @app.route('/upload', methods=['GET', 'POST'])
 @login_required
@@ -196,43 +425,38 @@ def creator_dashboard():
         file = request.files.get('photo')
         if file:
             filename = secure_filename(file.filename)
+            photo_fields = dict(title=request.form.get('title'), caption=request.form.get('caption'),
+                                location=request.form.get('location'), people_present=request.form.get('people'),
+                                user_id=current_user.id)
+            # The Azure path inserts the row after the response, so reject bad input up front
+            error = _photo_fields_error(photo_fields)
+            if error:
+                flash(error, 'danger')
+                return render_template('dashboard.html')
             try:
-                img = Image.open(file)
-                if img.mode != 'RGB': img = img.convert('RGB')
-                auto_tags = analyze_image(img)
-                img.thumbnail((1080, 1080))
+                # Decode/tag/encode in the image pool, away from the request worker
+                webp_bytes, photo_fields['auto_tags'] = _process_upload_cached(file.stream.read())
+                # Stored as WebP: ~25-35% smaller than JPEG at the same visual quality
+                b_name = f"{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{os.path.splitext(filename)[0]}.webp"
 
-                # Cloud upload if configured
+                # Cloud upload if configured (network I/O + DB insert run off the request thread)
                 if blob_service_client and AZURE_CONTAINER_NAME:
-                    logger.info('Uploading photo to Azure for user %s', current_user.username)
-                    buf = io.BytesIO()
-                    img.save(buf, format='JPEG', optimize=True, quality=85)
-                    buf.seek(0)
-                    b_name = f"{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{filename}"
-                    bc = blob_service_client.get_blob_client(container=AZURE_CONTAINER_NAME, blob=b_name)
-                    bc.upload_blob(buf, overwrite=True)
-                    file_url = bc.url
-                    logger.info('Uploaded to Azure: %s', file_url)
+                    logger.info('Queueing Azure upload for user %s', current_user.username)
+                    upload_executor.submit(_upload_and_commit, io.BytesIO(webp_bytes), b_name, photo_fields)
+                    flash('✓ Photo is uploading and will appear shortly!', 'success')
+                    return redirect(url_for('profile', username=current_user.username))
                 elif LOCAL_UPLOAD_FOLDER:
                     # Local fallback
                     logger.info('Saving photo locally for user %s', current_user.username)
-                    b_name = f"{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{filename}"
                     local_path = os.path.join(LOCAL_UPLOAD_FOLDER, b_name)
-                    try:
-                        img.save(local_path, format='JPEG', optimize=True, quality=85)
-                    except Exception:
-                        file.stream.seek(0)
-                        with open(local_path, 'wb') as f:
-                            f.write(file.stream.read())
+                    with open(local_path, 'wb') as f:
+                        f.write(webp_bytes)
                     file_url = url_for('static', filename=f'uploads/{b_name}', _external=True)
                 else:
                     flash('No storage configured for uploads.', 'danger')
                     return render_template('dashboard.html')
 
-                new_photo = Photo(filename=file_url, title=request.form.get('title'),
-                                  caption=request.form.get('caption'), location=request.form.get('location'),
-                                  people_present=request.form.get('people'), auto_tags=auto_tags, user_id=current_user.id)
-                db.session.add(new_photo)
+                db.session.add(Photo(filename=file_url, **photo_fields))
                 db.session.commit()
                 flash('✓ Photo uploaded!', 'success')
                 return redirect(url_for('profile', username=current_user.username))
@@ -250,7 +474,7 @@ def register():
         if User.query.filter_by(username=request.form.get('username')).first():
             flash('Username taken', 'danger'); return redirect(url_for('register'))
         new_user = User(username=request.form.get('username'), role=role,
-                        password=generate_password_hash(request.form.get('password')))
+                        password=password_hasher.hash(request.form.get('password')))
         db.session.add(new_user); db.session.commit()
         flash(f'Account created as {role.title()}! Please log in.', 'success')
         return redirect(url_for('login'))
@@ -260,7 +484,7 @@ def register():
 def login():
     if request.method == 'POST':
         user = User.query.filter_by(username=request.form.get('username')).first()
-        if user and check_password_hash(user.password, request.form.get('password')):
+        if user and verify_password(user, request.form.get('password')):
             if user.role == request.form.get('role'):
                 login_user(user)
                 return redirect(url_for('creator_dashboard' if user.role == 'creator' else 'feed'))
@@ -280,7 +504,7 @@ def edit_profile():
                 if blob_service_client and AZURE_CONTAINER_NAME:
                     b_name = f"avatar_{current_user.id}_{avatar_filename}"
                     bc = blob_service_client.get_blob_client(container=AZURE_CONTAINER_NAME, blob=b_name)
-                    bc.upload_blob(avatar, overwrite=True)
+                    bc.upload_blob(avatar.stream, overwrite=True)
                     current_user.avatar = bc.url
                     logger.info('Uploaded avatar to Azure for user %s', current_user.username)
                 else:
@@ -288,7 +512,7 @@ def edit_profile():
                     local_name = f"avatar_{current_user.id}_{avatar_filename}"
                     local_path = os.path.join(LOCAL_UPLOAD_FOLDER, local_name)
                     try:
-                        img = Image.open(avatar)
+                        img = Image.open(avatar.stream)
                         if img.mode != 'RGB': img = img.convert('RGB')
                         img.thumbnail((400, 400))
                         img.save(local_path, format='JPEG', optimize=True, quality=85)
@@ -308,9 +532,14 @@ def edit_profile():
 @app.route('/comment/<int:photo_id>', methods=['POST'])
 @login_required
 def add_comment(photo_id):
-    text = request.form.get('text')
+    text = (request.form.get('text') or '').strip()
+    # Bound the input before it becomes a key in the lru_caches below (column is String(500))
+    if not text or len(text) > COMMENT_MAX_LENGTH:
+        return jsonify({'success': False, 'message': f'Comments must be 1-{COMMENT_MAX_LENGTH} characters.'})
+    if _has_banned_word(text):
+        return jsonify({'success': False, 'message': 'AI Blocked: Inappropriate language! 🚫'})
     # Sentiment Analysis (Advanced Distinction Feature)
-    score = TextBlob(text).sentiment.polarity
+    score = _polarity(text)
     if score < -0.3:
         return jsonify({'success': False, 'message': 'AI Blocked: Negative content! 🚫'})
     # classify sentiment for UI badge
@@ -320,20 +549,19 @@ def add_comment(photo_id):
 
     db.session.add(Comment(text=text, user_id=current_user.id, photo_id=photo_id))
     db.session.commit()
+    _invalidate_feed_cache(current_user.id)
     return jsonify({'success': True, 'username': current_user.username, 'text': text, 'sentiment': sentiment})
 
 @app.route('/like/<int:photo_id>', methods=['POST'])
 @login_required
 def toggle_like(photo_id):
     photo = Photo.query.get_or_404(photo_id)
-    existing = Like.query.filter_by(user_id=current_user.id, photo_id=photo_id).first()
-    if existing:
-        db.session.delete(existing)
-        liked = False
-    else:
+    # DELETE first: its rowcount says whether the like existed, so no SELECT is needed
+    liked = not Like.query.filter_by(user_id=current_user.id, photo_id=photo_id).delete()
+    if liked:
         db.session.add(Like(user_id=current_user.id, photo_id=photo_id))
-        liked = True
     db.session.commit()
+    _invalidate_feed_cache(current_user.id)
     count = photo.likes.count()
     return jsonify({'count': count, 'liked': liked})
 
@@ -342,14 +570,12 @@ def toggle_like(photo_id):
 @login_required
 def toggle_save(photo_id):
     photo = Photo.query.get_or_404(photo_id)
-    existing = Save.query.filter_by(user_id=current_user.id, photo_id=photo_id).first()
-    if existing:
-        db.session.delete(existing)
-        saved = False
-    else:
+    # DELETE first: its rowcount says whether the save existed, so no SELECT is needed
+    saved = not Save.query.filter_by(user_id=current_user.id, photo_id=photo_id).delete()
+    if saved:
         db.session.add(Save(user_id=current_user.id, photo_id=photo_id))
-        saved = True
     db.session.commit()
+    _invalidate_feed_cache(current_user.id)
     return jsonify({'saved': saved})
 
 
@@ -393,6 +619,7 @@ def delete_post(photo_id):
     except Exception:
         logger.exception('Failed to delete photo record %s', photo_id)
         return jsonify({'success': False, 'message': 'DB delete failed'}), 500
+    _invalidate_feed_cache(current_user.id)
 
     return jsonify({'success': True})
 
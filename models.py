@@ -2,7 +2,8 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from datetime import datetime
 
-db = SQLAlchemy()
+# Keep loaded attributes after commit, so e.g. current_user.username doesn't re-SELECT after a write
+db = SQLAlchemy(session_options={'expire_on_commit': False})
 
 # Followers Table (Association Table)
 followers = db.Table('followers',
@@ -56,6 +57,11 @@ class User(UserMixin, db.Model):
         return self.followed.filter(followers.c.followed_id == user.id).count() > 0
 
 class Photo(db.Model):
+    # Feed orders by uploaded_at; profile filters by user_id and orders by uploaded_at
+    __table_args__ = (
+        db.Index('ix_photo_uploaded_at', 'uploaded_at'),
+        db.Index('ix_photo_user_uploaded', 'user_id', 'uploaded_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     # FIX: Filename limit 255 to store long S3 URLs
     filename = db.Column(db.String(255), nullable=False)
@@ -70,7 +76,7 @@ class Photo(db.Model):
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     
-    creator = db.relationship('User', backref='photos')
+    creator = db.relationship('User', backref=db.backref('photos', order_by='Photo.uploaded_at.desc()'))
     likes = db.relationship('Like', backref='photo', lazy='dynamic')
     saves = db.relationship('Save', backref='photo', lazy='dynamic')
     comments = db.relationship('Comment', backref='photo', lazy='dynamic', cascade="all, delete-orphan")
@@ -5,10 +5,6 @@ echo "=========================================="
 echo "LensLoft Photo Share App - Startup Script"
 echo "=========================================="
 
-# Download required NLTK data for TextBlob
-echo "Downloading NLTK data for sentiment analysis..."
-python -m textblob.download_corpora 2>/dev/null || python -c "import nltk; nltk.download('brown'); nltk.download('punkt')" 2>/dev/null
-
 # Create instance folder if not exists
 mkdir -p /home/site/wwwroot/instance
 